@@ -1,23 +1,91 @@
-import json
+import os
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
+from functools import cached_property
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional, List, Tuple
+from typing import Dict, Any, Optional, List
 
+import msgspec
+import numpy as np
 import pandas as pd
-from .parser import parse_message, ParsedTransaction
+import pyarrow as pa
+from .parser import CATEGORIES, DIRECTIONS, parse_messages
+
+# Copy-on-write: slices and shallow copies of the analyzer's frame are safe to
+# hand out without defensive deep copies (the default from pandas 3.0)
+pd.options.mode.copy_on_write = True
 
 @dataclass
 class Report:
     title: str
     markdown: str
 
+# Input schema of the SMS dump, decoded straight into slotted structs
+class Message(msgspec.Struct):
+    id: int
+    type: Optional[str] = None
+    sms: Optional[str] = None
+
+class Payload(msgspec.Struct):
+    messages: List[Message] = []
+
+# strict=False keeps accepting ids written as strings
+_PAYLOAD_DECODER = msgspec.json.Decoder(Payload, strict=False)
+
+# Messages parsed per batch (and per worker process); bounds the temporary
+# columns built by parse_messages
+_PARSE_CHUNK_SIZE = 50_000
+
+def _parse_chunk(messages: List[Message]) -> pd.DataFrame:
+    return parse_messages(
+        msg_ids=pd.Series([m.id for m in messages], dtype="int64"),
+        # Missing or null type/sms fall back to the same defaults
+        raw_types=pd.Series([m.type if m.type is not None else "unknown" for m in messages], dtype=object),
+        sms=pd.Series([m.sms if m.sms is not None else "" for m in messages], dtype=object),
+    )
+
+def _md_cell(v: Any) -> str:
+    # Whole-number floats (e.g. year, once an undated row makes the column float) print as ints
+    if isinstance(v, float) and v.is_integer():
+        return str(int(v))
+    return str(v)
+
+def _md_table(df: pd.DataFrame) -> str:
+    """Render df as a GitHub-style markdown table (no index)."""
+    rows = ["| " + " | ".join(map(str, df.columns)) + " |",
+            "|" + "|".join(["---"] * len(df.columns)) + "|"]
+    rows += ["| " + " | ".join(map(_md_cell, row)) + " |" for row in df.itertuples(index=False, name=None)]
+    return "\n".join(rows)
+
+def _sum_by_code(labels: pd.Series, amounts: pd.Series, fill: str) -> pd.Series:
+    """
+    Sum amounts per label of a categorical Series, as a scatter-add over its codes.
+    Missing labels are counted under fill; labels with no rows are left out.
+    """
+    categories = labels.cat.categories
+    if fill in categories:
+        fill_code = categories.get_loc(fill)
+    else:
+        fill_code = len(categories)
+        categories = categories.append(pd.Index([fill]))
+    codes = labels.cat.codes.to_numpy()
+    codes = np.where(codes < 0, fill_code, codes)
+
+    counts = np.bincount(codes, minlength=len(categories))
+    sums = np.bincount(codes, weights=amounts.fillna(0).to_numpy(np.float64), minlength=len(categories))
+    seen = counts > 0
+    return pd.Series(sums[seen], index=categories[seen].rename(labels.name), name=amounts.name)
+
 class MoMoAnalyzer:
     def __init__(self, df: pd.DataFrame):
-        self.df = df.copy()
+        self.df = df.copy(deep=False)
 
         # Normalize timestamp to pandas datetime
         self.df["timestamp"] = pd.to_datetime(self.df["timestamp"], errors="coerce")
+        # Chronological order (NaT last), so date ranges are contiguous row slices
+        self.df = self.df.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
+        self._dated_ts = self.df["timestamp"].dropna()
         self.df["date"] = self.df["timestamp"].dt.date
         self.df["month"] = self.df["timestamp"].dt.to_period("M").astype(str)
         self.df["week"] = self.df["timestamp"].dt.to_period("W").astype(str)
@@ -27,34 +95,57 @@ class MoMoAnalyzer:
         for col in ["amount_rwf", "fee_rwf", "balance_rwf"]:
             self.df[col] = pd.to_numeric(self.df[col], errors="coerce")
 
+        # Arrow-backed SMS text: searches run in Arrow's case-insensitive substring kernel
+        self.df["raw_sms"] = self.df["raw_sms"].astype(pd.ArrowDtype(pa.string()))
+
+        # Low-cardinality labels as categoricals: filters and groupbys run on integer codes
+        self.df["direction"] = self.df["direction"].astype(pd.CategoricalDtype(DIRECTIONS))
+        self.df["category"] = self.df["category"].astype(pd.CategoricalDtype(CATEGORIES))
+        self.df["raw_type"] = self.df["raw_type"].astype("category")
+        self.df["counterparty"] = self.df["counterparty"].astype("category")
+
+        # The analyzer is not mutated after construction, so aggregates are memoized
+        self._period_cache: Dict[str, pd.DataFrame] = {}
+
     @staticmethod
     def from_json(path: str | Path) -> "MoMoAnalyzer":
+        """
+        Load and parse an SMS dump.
+
+        Dumps larger than one parse chunk are parsed in worker processes
+        when more than one CPU is available. With the spawn or forkserver start
+        methods, call this from under an ``if __name__ == "__main__":`` guard.
+        """
         path = Path(path)
-        payload = json.loads(path.read_text(encoding="utf-8"))
-        rows: List[Dict[str, Any]] = []
-        for m in payload.get("messages", []):
-            pt: ParsedTransaction = parse_message(
-                msg_id=int(m.get("id")),
-                raw_type=str(m.get("type", "unknown")),
-                sms=str(m.get("sms", "")),
-            )
-            rows.append(pt.to_row())
-        df = pd.DataFrame(rows)
+        messages = _PAYLOAD_DECODER.decode(path.read_bytes()).messages
+        if len(messages) <= _PARSE_CHUNK_SIZE:
+            df = _parse_chunk(messages)
+        else:
+            batches = [messages[i:i + _PARSE_CHUNK_SIZE] for i in range(0, len(messages), _PARSE_CHUNK_SIZE)]
+            cpus = os.cpu_count() or 1
+            if cpus > 1:
+                # Regex parsing is CPU-bound and chunks are independent: spread them over processes
+                with ProcessPoolExecutor(max_workers=min(len(batches), cpus)) as pool:
+                    df = pd.concat(pool.map(_parse_chunk, batches), ignore_index=True)
+            else:
+                df = pd.concat(map(_parse_chunk, batches), ignore_index=True)
         return MoMoAnalyzer(df)
     
     def transactions(self) -> pd.DataFrame:
-        return self.df.copy()
-    
-    def _split_income_expense(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
-        income = self.df[self.df["direction"] == "in"].copy()
-        expense = self.df[self.df["direction"] == "out"].copy()
-        return income, expense
+        # Lazy under copy-on-write: data is only copied if the caller writes to it
+        return self.df.copy(deep=False)
     
     def summary(self) -> Dict[str, Any]:
-        income, expense = self._split_income_expense()
+        return dict(self._summary)
+
+    @cached_property
+    def _summary(self) -> Dict[str, Any]:
+        # Masks on the two columns involved; no row subsets of the full frame
+        amount = self.df["amount_rwf"]
+        direction = self.df["direction"]
 
-        total_in = float(income["amount_rwf"].sum(skipna=True))
-        total_out = float(expense["amount_rwf"].sum(skipna=True))
+        total_in = float(amount[direction == "in"].sum(skipna=True))
+        total_out = float(amount[direction == "out"].sum(skipna=True))
         total_fees = float(self.df["fee_rwf"].sum(skipna=True))
         net = total_in - total_out - total_fees
 
@@ -66,26 +157,32 @@ class MoMoAnalyzer:
             "tx_count": int(len(self.df)),
         }
     
-    def period_summary(self, period: str = "month") -> pd.DataFrame:
+    def period_summary(self, period: str = "month", df: Optional[pd.DataFrame] = None) -> pd.DataFrame:
+        """Per-period totals over self.df, or over df (a subset of self.df, e.g. from filter_range)."""
         if period not in {"week", "month", "year"}:
             raise ValueError("period must be one of: week, month, year")
 
-        df = self.df.copy()
-
-        df["income_amt"] = df["amount_rwf"].where(df["direction"] == "in", 0)
-        df["expense_amt"] = df["amount_rwf"].where(df["direction"] == "out", 0)
-        df["fee_amt"] = df["fee_rwf"].fillna(0)
-
-        out = (
-            df.groupby(period, dropna=False)
-            .agg(
-                tx_count=("msg_id", "count"),
-                income_rwf=("income_amt", "sum"),
-                expense_rwf=("expense_amt", "sum"),
-                fees_rwf=("fee_amt", "sum"),
-            )
-            .reset_index()
+        if df is not None:
+            return self._period_summary(period, df)
+        if period not in self._period_cache:
+            self._period_cache[period] = self._period_summary(period, self.df)
+        return self._period_cache[period].copy(deep=False)
+
+    def _period_summary(self, period: str, df: pd.DataFrame) -> pd.DataFrame:
+        # Income/expense in one groupby over (period, direction) instead of
+        # materializing a masked copy of amount_rwf per direction
+        by_direction = (
+            df.groupby([period, "direction"], dropna=False, observed=True)["amount_rwf"].sum()
+            .unstack("direction", fill_value=0)
+            .reindex(columns=["in", "out"], fill_value=0)
+        )
+        out = df.groupby(period, dropna=False).agg(
+            tx_count=("msg_id", "count"),
+            fees_rwf=("fee_rwf", "sum"),
         )
+        out["income_rwf"] = by_direction["in"]
+        out["expense_rwf"] = by_direction["out"]
+        out = out[["tx_count", "income_rwf", "expense_rwf", "fees_rwf"]].reset_index()
 
         out["net_rwf"] = out["income_rwf"] - out["expense_rwf"] - out["fees_rwf"]
 
@@ -93,32 +190,45 @@ class MoMoAnalyzer:
             out[c] = pd.to_numeric(out[c], errors="coerce").fillna(0).astype(int)
 
         out["tx_count"] = out["tx_count"].astype(int)
-        return out.sort_values(period)
+        # year is float in self.df when any message is undated; a subset with
+        # only dated rows reports it as int, as a fresh analyzer would
+        if period == "year" and out[period].dtype.kind == "f" and out[period].notna().all():
+            out[period] = out[period].astype(int)
+        # groupby already returns the periods in sorted order
+        return out
 
     
     def top_counterparties(self, direction: str = "out", n: int = 10) -> pd.DataFrame:
-        df = self.df[self.df["direction"] == direction].copy()
-        df["counterparty"] = df["counterparty"].fillna("Unknown")
-        out = df.groupby("counterparty")["amount_rwf"].sum().sort_values(ascending=False).head(n).reset_index()
+        df = self.df.loc[self.df["direction"] == direction, ["counterparty", "amount_rwf"]]
+        sums = _sum_by_code(df["counterparty"], df["amount_rwf"], fill="Unknown")
+        out = sums.sort_values(ascending=False).head(n).reset_index()
         out["amount_rwf"] = out["amount_rwf"].fillna(0).astype(int)
         return out
     
     def category_breakdown(self, direction: str = "out") -> pd.DataFrame:
-        df = self.df[self.df["direction"] == direction].copy()
-        df["category"] = df["category"].fillna("other")
-        out = df.groupby("category")["amount_rwf"].sum().sort_values(ascending=False).reset_index()
+        df = self.df.loc[self.df["direction"] == direction, ["category", "amount_rwf"]]
+        sums = _sum_by_code(df["category"], df["amount_rwf"], fill="other")
+        out = sums.sort_values(ascending=False).reset_index()
         out["amount_rwf"] = out["amount_rwf"].fillna(0).astype(int)
         return out
     
+    def text_mask(self, text: str) -> pd.Series:
+        """Boolean mask over self.df: rows whose SMS or counterparty contains text (case-insensitive)."""
+        sms_hit = self.df["raw_sms"].str.contains(text, case=False, regex=False).fillna(False)
+        # Counterparties are categorical: test each distinct name once, then look up by code
+        cp = self.df["counterparty"].cat
+        cp_hit = np.append(cp.categories.str.contains(text, case=False, regex=False), False)
+        return sms_hit.astype(bool) | cp_hit[cp.codes.to_numpy()]
+
     def filter_range(self, start: Optional[str] = None, end: Optional[str] = None) -> pd.DataFrame:
-        df = self.df.copy()
+        # Binary search on the sorted timestamps; rows without one only survive an open range
+        lo, hi = 0, len(self.df)
         if start:
-            start_dt = pd.to_datetime(start)
-            df = df[df["timestamp"] >= start_dt]
+            lo = int(self._dated_ts.searchsorted(pd.to_datetime(start), side="left"))
+            hi = len(self._dated_ts)
         if end:
-            end_dt = pd.to_datetime(end)
-            df = df[df["timestamp"] <= end_dt]
-        return df
+            hi = int(self._dated_ts.searchsorted(pd.to_datetime(end), side="right"))
+        return self.df.iloc[lo:hi]
     
     def render_report(self, period: str) -> Report:
         s = self.summary()
@@ -136,10 +246,10 @@ class MoMoAnalyzer:
         md.append(f"- Net: **{s['net_rwf']:,} RWF**\n")
 
         md.append("\n## By period\n")
-        md.append(ps.to_markdown(index=False))
+        md.append(_md_table(ps))
         md.append("\n\n## Top spend counterparties\n")
-        md.append(top_out.to_markdown(index=False))
+        md.append(_md_table(top_out))
         md.append("\n\n## Expense by category\n")
-        md.append(cats_out.to_markdown(index=False))
+        md.append(_md_table(cats_out))
 
         return Report(title=f"MoMo Finance Report ({period})", markdown="\n".join(md) + "\n")
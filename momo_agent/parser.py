@@ -1,9 +1,10 @@
 import re
-from dataclasses import dataclass
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict
 
-from dateutil import parser as dtparser
+import msgspec
+import numpy as np
+import pandas as pd
 
 # Helpers
 
@@ -12,6 +13,7 @@ _AMOUNT_RE = re.compile(r"(?P<amt>\d[\d,]*(?:\.\d+)?)\s*RWF", re.IGNORECASE)
 _FEE_RE = re.compile(r"Fee\s*[: ]\s*(?P<fee>\d[\d,]*(?:\.\d+)?)\s*RWF", re.IGNORECASE)
 _BAL_RE = re.compile(r"Balance\s*[: ]\s*(?P<bal>\d[\d,]*(?:\.\d+)?)\s*RWF", re.IGNORECASE)
 _DATETIME_RE = re.compile(r"(?P<dt>\d{4}-\d{2}-\d{2}\s+\d{2}:\d{2}:\d{2})")
+_DATETIME_FMT = "%Y-%m-%d %H:%M:%S"
 _TXID_RE = re.compile(r"TxId\s*[: ]\s*(?P<txid>[A-Za-z0-9]+)", re.IGNORECASE)
 _FTID_RE = re.compile(r"FT\s*Id\s*[: ]\s*(?P<ftid>[A-Za-z0-9\-]+)", re.IGNORECASE)
 _ETID_RE = re.compile(r"ET\s*Id\s*[: ]\s*(?P<etid>[A-Za-z0-9\-]+)", re.IGNORECASE)
@@ -21,10 +23,27 @@ _TO_RE = re.compile(r"\bto\s+(?P<name>[A-Za-z0-9 &\-\.\']+?)(?:\s*\(|\s+was\b|\s
 _FROM_RE = re.compile(r"\bfrom\s+(?P<name>[A-Za-z0-9 &\-\.\']+?)(?:\s*\(|\s+at\b|\.|,)", re.IGNORECASE)
 _PHONE_RE = re.compile(r"\((?P<msisdn>\d{6,})\)")
 
+## Field scan: (group name, regex, literal the match must contain, lowercased).
+## The literal check is a plain substring search, so patterns that cannot match
+## are skipped without running the (case-insensitive, backtracking) regex.
+_FIELD_PATTERNS = (
+    ("amt", _AMOUNT_RE, "rwf"),
+    ("fee", _FEE_RE, "fee"),
+    ("bal", _BAL_RE, "balance"),
+    ("txid", _TXID_RE, "txid"),
+    ("ftid", _FTID_RE, "ft"),
+    ("etid", _ETID_RE, "et"),
+    ("msisdn", _PHONE_RE, "("),
+)
+
 def _to_int(x: Optional[str]) -> Optional[int]:
     if not x:
         return None
     x = x.replace(",", "")
+    try:
+        return int(x)
+    except ValueError:
+        pass
     # Some messages may include decimals (rare) — keep as int RWF for reporting
     try:
         return int(float(x))
@@ -36,14 +55,26 @@ def _parse_datetime(text: str) -> Optional[datetime]:
     m = _DATETIME_RE.search(text)
     if m:
         try:
-            return dtparser.parse(m.group("dt"))
-        except Exception:
+            return datetime.strptime(m.group("dt"), _DATETIME_FMT)
+        except ValueError:
             return None
     return None
 
+def _scan_fields(text: str) -> Dict[str, str]:
+    """Single pass over the field patterns, keyed by group name (first match wins)."""
+    lowered = text.lower()
+    found: Dict[str, str] = {}
+    for name, regex, literal in _FIELD_PATTERNS:
+        if literal not in lowered:
+            continue
+        m = regex.search(text)
+        if m:
+            found[name] = m.group(name)
+    return found
+
 # Data model
-@dataclass
-class ParsedTransaction:
+# Slotted and immutable; one is built per parse_message call
+class ParsedTransaction(msgspec.Struct, frozen=True):
     msg_id: int
     raw_type: str
     timestamp: Optional[datetime]
@@ -51,31 +82,16 @@ class ParsedTransaction:
     category: str # "transfer", "merchant", "utilities", "cash" or "other"
     counterparty: Optional[str]
     msisdn: Optional[str]
-    amount_rwf: Optional[str]
-    fee_rwf: Optional[str]
-    balance_rwf: Optional[str]
+    amount_rwf: Optional[int]
+    fee_rwf: Optional[int]
+    balance_rwf: Optional[int]
     txid: Optional[str]
     ftid: Optional[str]
     etid: Optional[str]
     raw_sms: str
 
-    def to_row(self) -> Dict[str, Any]:
-        return {
-            "msg_id": self.msg_id,
-            "raw_type": self.raw_type,
-            "timestamp": self.timestamp.isoformat(sep=" ") if self.timestamp else None,
-            "direction": self.direction,
-            "category": self.category,
-            "counterparty": self.counterparty,
-            "msisdn": self.msisdn,
-            "amount_rwf": self.amount_rwf,
-            "fee_rwf": self.fee_rwf,
-            "balance_rwf": self.balance_rwf,
-            "txid": self.txid,
-            "ftid": self.ftid,
-            "etid": self.etid,
-            "raw_sms": self.raw_sms,
-        }
+DIRECTIONS = ("in", "out", "unknown")
+CATEGORIES = ("transfer", "merchant", "utilities", "cash", "other")
 
 TYPE_MAP = {
     "sms_received_from_momo": ("in", "transfer"),
@@ -90,63 +106,29 @@ def parse_message(msg_id: int, raw_type: str, sms: str) -> ParsedTransaction:
     sms_norm = " ".join((sms or "").split())
     direction, category = TYPE_MAP.get(raw_type, ("unknown", "other"))
 
-    amt = None
-    m_amt = _AMOUNT_RE.search(sms_norm)
-    if m_amt:
-        amt = _to_int(m_amt.group("amt"))
-
-    fee = None
-    m_fee = _FEE_RE.search(sms_norm)
-    if m_fee:
-        fee = _to_int(m_fee.group("fee"))
-
-    bal = None
-    m_bal = _BAL_RE.search(sms_norm)
-    if m_bal:
-        bal = _to_int(m_bal.group("bal"))
-
+    fields = _scan_fields(sms_norm)
+    amt = _to_int(fields.get("amt"))
+    fee = _to_int(fields.get("fee"))
+    bal = _to_int(fields.get("bal"))
     ts = _parse_datetime(sms_norm)
+    txid = fields.get("txid")
+    ftid = fields.get("ftid")
+    etid = fields.get("etid")
 
-    txid = None
-    m_txid = _TXID_RE.search(sms_norm)
-    if m_txid:
-        txid = m_txid.group("txid")
-
-    ftid = None
-    m_ftid = _FTID_RE.search(sms_norm)
-    if m_ftid:
-        ftid = m_ftid.group("ftid")
-
-    etid = None
-    m_etid = _ETID_RE.search(sms_norm)
-    if m_etid:
-        etid = m_etid.group("etid")
-
-    
     # Counterparty
     counterparty = None
-    msisdn = None
 
     if direction == "out":
-        m_to = _TO_RE.search(sms_norm)
-        if m_to:
-            counterparty = m_to.group("name").strip(" .,-")
+        m_party = _TO_RE.search(sms_norm)
     elif direction == "in":
-        m_from = _FROM_RE.search(sms_norm)
-        if m_from:
-            counterparty = m_from.group("name").strip(" .,-")
+        m_party = _FROM_RE.search(sms_norm)
     else:
-        # Try both
-        m_to = _TO_RE.search(sms_norm)
-        m_from = _FROM_RE.search(sms_norm)
-        if m_to:
-            counterparty = m_to.group("name").strip(" .,-")
-        elif m_from:
-            counterparty = m_from.group("name").strip(" .,-")
-
-    m_phone = _PHONE_RE.search(sms_norm)
-    if m_phone:
-        msisdn = m_phone.group("msisdn")
+        # Try "to" first; "from" only runs when there is no recipient
+        m_party = _TO_RE.search(sms_norm) or _FROM_RE.search(sms_norm)
+    if m_party:
+        counterparty = m_party.group("name").strip(" .,-")
+
+    msisdn = fields.get("msisdn")
 
     return ParsedTransaction(
         msg_id=msg_id,
@@ -163,4 +145,49 @@ def parse_message(msg_id: int, raw_type: str, sms: str) -> ParsedTransaction:
         ftid=ftid,
         etid=etid,
         raw_sms=sms,
-    )
\ No newline at end of file
+    )
+
+
+
+# Bulk parsing
+def _to_int_series(s: pd.Series) -> pd.Series:
+    num = pd.to_numeric(s.str.replace(",", "", regex=False), errors="coerce")
+    if num.dtype.kind != "f":
+        return num
+    # Same as _to_int: decimals are truncated to whole RWF. Like a column of
+    # ints/None, it is only left as float when some values are missing.
+    num = np.trunc(num)
+    return num if num.isna().any() else num.astype("int64")
+
+
+def parse_messages(msg_ids: pd.Series, raw_types: pd.Series, sms: pd.Series) -> pd.DataFrame:
+    """Vectorized parse_message: one row per message, one column per ParsedTransaction field."""
+    sms_norm = sms.str.split().str.join(" ")
+    direction = raw_types.map({k: v[0] for k, v in TYPE_MAP.items()}).fillna("unknown")
+    category = raw_types.map({k: v[1] for k, v in TYPE_MAP.items()}).fillna("other")
+
+    def extract(regex: re.Pattern) -> pd.Series:
+        return sms_norm.str.extract(regex, expand=False)
+
+    # Counterparty: "to" for outgoing, "from" for incoming, "to" then "from" for
+    # unknown. Each pattern only runs on the rows that can use its match.
+    counterparty = sms_norm[direction != "in"].str.extract(_TO_RE, expand=False).reindex(sms_norm.index)
+    needs_from = (direction == "in") | ((direction == "unknown") & counterparty.isna())
+    counterparty[needs_from] = sms_norm[needs_from].str.extract(_FROM_RE, expand=False)
+
+    return pd.DataFrame({
+        "msg_id": msg_ids,
+        "raw_type": raw_types,
+        "timestamp": pd.to_datetime(extract(_DATETIME_RE), format=_DATETIME_FMT, errors="coerce"),
+        "direction": direction,
+        "category": category,
+        "counterparty": counterparty.str.strip(" .,-"),
+        "msisdn": extract(_PHONE_RE),
+        "amount_rwf": _to_int_series(extract(_AMOUNT_RE)),
+        "fee_rwf": _to_int_series(extract(_FEE_RE)),
+        "balance_rwf": _to_int_series(extract(_BAL_RE)),
+        "txid": extract(_TXID_RE),
+        "ftid": extract(_FTID_RE),
+        "etid": extract(_ETID_RE),
+        "raw_sms": sms,
+    })
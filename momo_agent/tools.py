@@ -1,6 +1,8 @@
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+import numpy as np
+
 from .analyzer import MoMoAnalyzer
 
 @dataclass
@@ -16,13 +18,8 @@ def make_tools(analyzer: MoMoAnalyzer):
         return analyzer.summary()
     
     def get_period_summary(period: str, start: str | None = None, end: str | None = None) -> List[Dict[str, Any]]:
-        df = analyzer.transactions()
-
-        if start or end:
-            df = analyzer.filter_range(start=start, end=end)
-
-        tmp = MoMoAnalyzer(df)
-        out = tmp.period_summary(period)
+        df = analyzer.filter_range(start=start, end=end) if start or end else None
+        out = analyzer.period_summary(period, df=df)
         return out.to_dict(orient="records")
 
     
@@ -57,13 +54,16 @@ def make_tools(analyzer: MoMoAnalyzer):
                 df = df[df["category"] == category]
 
             if text:
-                t = text.lower()
-                df = df[df["raw_sms"].str.lower().str.contains(t, na=False) |
-                        df["counterparty"].fillna("").str.lower().str.contains(t, na=False)]
-            df = df.sort_values("timestamp", ascending=False).head(int(limit))
+                df = df[analyzer.text_mask(text).loc[df.index]]
+
+            # Rows are in chronological order with NaT last: newest first, undated rows at the end
+            n_dated = int(df["timestamp"].notna().sum())
+            newest_first = np.concatenate([np.arange(n_dated)[::-1], np.arange(n_dated, len(df))])
+            df = df.iloc[newest_first[:int(limit)]]
 
             cols = ["timestamp","direction","category","counterparty","amount_rwf","fee_rwf","raw_type","txid"]
-            out = df[cols].copy()
+            # Categorical labels back to plain objects so missing values become None below
+            out = df[cols].astype({c: object for c in ["direction", "category", "counterparty", "raw_type"]})
 
             out["timestamp"] = out["timestamp"].astype(str)
             out = out.where(out.notna(), None)
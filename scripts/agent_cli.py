@@ -3,12 +3,12 @@ from pathlib import Path
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 import argparse
-import json
 import os
 import logging
 from datetime import datetime
 from typing import Any, Dict, List
 
+import orjson
 from rich.console import Console
 from rich.panel import Panel
 from rich.pretty import Pretty
@@ -63,7 +63,7 @@ def _log_tool_calls(logger: logging.Logger, tool_calls: Any) -> None:
 
 def _log_json(logger: logging.Logger, label: str, payload: Any) -> None:
     try:
-        logger.info(f"{label}={json.dumps(payload, ensure_ascii=False, default=str)}")
+        logger.info(f"{label}={orjson.dumps(payload, default=str).decode()}")
     except Exception:
         logger.info(f"{label}=<unserializable>")
 
@@ -176,6 +176,10 @@ def _tool_schemas():
         },
     ]
 
+# Static for the whole process; built once at import
+_TOOL_SCHEMAS = _tool_schemas()
+_ALLOWED_ARGS = _allowed_args_from_schema(_TOOL_SCHEMAS)
+
 SYSTEM = (
     "You are MoMo Finance Agent. Use tools for any calculation or totals. "
     "Never invent numbers. If a question cannot be answered from tools, say so "
@@ -206,8 +210,6 @@ def run_agent(analyzer: MoMoAnalyzer, model: str):
     
     client = Mistral(api_key=api_key)
     tools_py = make_tools(analyzer)
-    tools_schema = _tool_schemas()
-    allowed_args = _allowed_args_from_schema(tools_schema)
 
     logger = _new_session_logger()
     logger.info(f"model={model}")
@@ -232,7 +234,7 @@ def run_agent(analyzer: MoMoAnalyzer, model: str):
             resp = client.chat.complete(
                 model=model,
                 messages=messages,
-                tools=tools_schema,
+                tools=_TOOL_SCHEMAS,
             )
         except Exception:
             logger.exception("first_model_call_failed")
@@ -272,11 +274,11 @@ def run_agent(analyzer: MoMoAnalyzer, model: str):
             fn = tc.function.name
 
             try:
-                args = json.loads(tc.function.arguments or "{}")
+                args = orjson.loads(tc.function.arguments or "{}")
             except Exception as e:
                 tool_out = {"ok": False, "error": f"Bad tool arguments JSON: {e}"}
             else:
-                tool_out = _safe_tool_call(tools_py, allowed_args, fn, args)
+                tool_out = _safe_tool_call(tools_py, _ALLOWED_ARGS, fn, args)
             _log_json(logger, f"tool_result[{fn}]", tool_out)
 
             messages.append(
@@ -284,7 +286,7 @@ def run_agent(analyzer: MoMoAnalyzer, model: str):
                     "role": "tool",
                     "tool_call_id": tc.id,
                     "name": fn,
-                    "content": json.dumps(tool_out, ensure_ascii=False, default=str),
+                    "content": orjson.dumps(tool_out, default=str).decode(),
                 }
             )
 
@@ -292,7 +294,7 @@ def run_agent(analyzer: MoMoAnalyzer, model: str):
             resp2 = client.chat.complete(
                 model=model,
                 messages=messages,
-                tools=tools_schema,
+                tools=_TOOL_SCHEMAS,
             )
             final = resp2.choices[0].message.content or "Done."
         except Exception: